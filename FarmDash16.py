@@ -1,66 +1,36 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import folium
-from streamlit_folium import st_folium
-from folium.plugins import Draw
-import requests
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 import altair as alt
-import json
-import math
+import numpy as np
+import orjson
+from itertools import accumulate
+from pathlib import Path
 
 # --- 0. Page Configuration & UI Cleanup ---
-st.set_page_config(layout="wide", page_title="Digital Twin")
+st.set_page_config(page_title="FarmOS Pro", layout="wide", page_icon="🚜")
 
-# Custom CSS to hide the GitHub icon, Deploy button, and footer
-hide_st_style = """
+# Custom CSS to hide the GitHub icon, Deploy button, and footer, plus the app theme.
+# One style-only st.html per rerun: it bypasses the markdown renderer and takes no space in the layout.
+app_style = """
             <style>
             #MainMenu {visibility: hidden;}
             footer {visibility: hidden;}
             header {visibility: hidden;}
             .stAppDeployButton {display:none !important;}
             div[data-testid="stToolbar"] {display: none !important;}
+            [data-testid="stAppViewContainer"] { background-color: #0f172a; }
+            [data-testid="stHeader"] { background: rgba(0,0,0,0); }
+            .block-container { padding: 0rem; }
+            [data-testid="stSidebar"] { background-color: #1e293b; border-right: 1px solid #334155; }
+            .stDataFrame { background-color: #1e293b; border-radius: 10px; }
             </style>
             """
-st.markdown(hide_st_style, unsafe_allow_html=True)
-
-# --- 1. SECURITY CHECK ---
-def check_password():
-    def password_entered():
-        if st.session_state["password"] == st.secrets["password"]:
-            st.session_state["password_correct"] = True
-            del st.session_state["password"]
-        else:
-            st.session_state["password_correct"] = False
-    if "password_correct" not in st.session_state:
-        st.text_input("FarmOS Password", type="password", on_change=password_entered, key="password")
-        return False
-    elif not st.session_state["password_correct"]:
-        st.text_input("FarmOS Password", type="password", on_change=password_entered, key="password")
-        st.error("😕 Password incorrect")
-        return False
-    return True
+st.html(app_style)
 
-if not check_password():
-    st.stop()
-
-# --- 2. CONFIGURATION & STYLING ---
-st.set_page_config(page_title="FarmOS Pro", layout="wide", page_icon="🚜")
-
-st.markdown("""
-    <script src="https://cdn.tailwindcss.com"></script>
-    <style>
-        [data-testid="stAppViewContainer"] { background-color: #0f172a; }
-        [data-testid="stHeader"] { background: rgba(0,0,0,0); }
-        .block-container { padding: 0rem; }
-        [data-testid="stSidebar"] { background-color: #1e293b; border-right: 1px solid #334155; }
-        .stDataFrame { background-color: #1e293b; border-radius: 10px; }
-    </style>
-""", unsafe_allow_html=True)
-
-# --- 3. CROP KNOWLEDGE BASE (Stages + Care) ---
+# --- 1. CROP KNOWLEDGE BASE (Stages + Care) ---
 CROP_STAGES = {
     "Sweet Corn": {
         "totalDuration": 85,
@@ -97,192 +67,189 @@ CROP_STAGES = {
     }
 }
 
-# --- 4. CORE LOGIC FUNCTIONS ---
+# Cumulative end day of each stage plus its (name, icon, care), built once for searchsorted lookups.
+# The trailing "Ready" entry is what a crop resolves to once it has passed its last stage.
+_READY_STAGE = ("Ready", "✅", ["Harvest and cure."])
+_STAGE_INDEX = {
+    k: (np.array(list(accumulate(s['days'] for s in v['stages']))), [(s['name'], s['icon'], s['care']) for s in v['stages']] + [_READY_STAGE])
+    for k, v in CROP_STAGES.items()
+}
+_NO_STAGES = (np.array([], dtype=int), [_READY_STAGE])
+CROP_DURATIONS = pd.Series({k: v['totalDuration'] for k, v in CROP_STAGES.items()}, name="dur")
+# Column dtypes of crop_db; name only admits CROP_STAGES keys, the same options the inventory editor offers
+CROP_DB_DTYPES = {"name": pd.CategoricalDtype(list(CROP_STAGES)), "planted": "datetime64[ns]", "rainfall_mm": "int64"}
+
+# --- 2. CORE LOGIC FUNCTIONS ---
+_SAST = ZoneInfo("Africa/Johannesburg")
+
 def get_sast_now():
-    sast = datetime.now(pytz.timezone("Africa/Johannesburg"))
-    return sast - timedelta(hours=2)
+    return datetime.now(_SAST)
 
 def calculate_polygon_area(coords):
     """Calculates area in square metres using the Shoelace formula and Earth radius."""
     if not coords or len(coords) < 3:
         return 0
-    area = 0.0
     R = 6378137 # Earth's radius in metres
-    for i in range(len(coords)):
-        p1 = coords[i]
-        p2 = coords[(i + 1) % len(coords)]
-        area += math.radians(p2[0] - p1[0]) * (2 + math.sin(math.radians(p1[1])) + math.sin(math.radians(p2[1])))
-    return abs(area * R * R / 2.0)
+    a = np.asarray(coords, dtype=np.float64)
+    lon_r = np.radians(a[:, 0])
+    lat_r = np.radians(a[:, 1])
+    d_lon = np.roll(lon_r, -1) - lon_r
+    sin_lat = np.sin(lat_r)
+    s = sin_lat + np.roll(sin_lat, -1)
+    return float(abs((d_lon * (2 + s)).sum()) * R * R / 2.0)
 
-def process_crops(data):
-    now = get_sast_now().replace(tzinfo=None)
-    processed = []
-    for item in data:
-        p_date = datetime.strptime(item['planted'], "%Y-%m-%d") if isinstance(item['planted'], str) else pd.to_datetime(item['planted'])
-        config = CROP_STAGES.get(item['name'], {"totalDuration": 90, "stages": []})
-        total_days = config['totalDuration']
-        ready_date = p_date + timedelta(days=total_days)
-        days_passed = (now - p_date).days
-        
-        # Determine specific growth stage
-        curr_stage = "Ready"
-        curr_icon = "✅"
-        stage_care = ["Harvest and cure."]
-        accumulated = 0
-        for s in config.get('stages', []):
-            if accumulated <= days_passed < (accumulated + s['days']):
-                curr_stage = s['name']
-                curr_icon = s['icon']
-                stage_care = s['care']
-                break
-            accumulated += s['days']
+@st.cache_data(ttl=3600)
+def process_crops(data, today):
+    """Builds the dashboard rows for each crop. `today` is only part of the cache key so results roll over at midnight."""
+    if data.empty:
+        return []
+    df = data.reset_index(drop=True)
+    now = pd.Timestamp(get_sast_now().replace(tzinfo=None))
+    # planted is already datetime64; blank editor dates are NaT and count as planted today
+    p_date = df['planted'].fillna(now.normalize())
+    duration = df['name'].astype(object).map(CROP_DURATIONS).fillna(90).astype(int)
+    days_passed = (now - p_date).dt.days
+    days_left = (p_date + pd.to_timedelta(duration, unit="D") - now).dt.days
+    is_harvested = days_left < 0
+    progress = np.where(is_harvested, 100, np.clip(days_passed.to_numpy() * 100 // duration.to_numpy(), 0, 100))
+
+    # Determine specific growth stage, one searchsorted per crop type (category code; -1 is a blank name)
+    stages = [None] * len(df)
+    passed = days_passed.to_numpy()
+    codes = df['name'].cat.codes.to_numpy()
+    for code in np.unique(codes):
+        rows = np.flatnonzero(codes == code)
+        ends, meta = _STAGE_INDEX[df['name'].cat.categories[code]] if code >= 0 else _NO_STAGES
+        idx = np.where(passed[rows] >= 0, np.searchsorted(ends, passed[rows], side="right"), len(ends))
+        for r, i in zip(rows, idx):
+            stages[r] = meta[i]
+    curr_stage, curr_icon, stage_care = zip(*stages)
+
+    # Format from the integer date parts; much cheaper than strftime per row
+    df['planted_str'] = [f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(p_date.dt.year.to_numpy(), p_date.dt.month.to_numpy(), p_date.dt.day.to_numpy())]
+    df['progress'] = progress
+    df['status'] = np.where(is_harvested, "Harvested", [f"{i} {n}" for i, n in zip(curr_icon, curr_stage)])
+    df['days_left'] = days_left
+    df['overdue_label'] = np.where(is_harvested, "Overdue by " + days_left.abs().astype(str), days_left.astype(str) + " days left")
+    df['is_harvested'] = is_harvested
+    # Progress ring attributes, so the dashboard component only copies values into the DOM
+    df['ring_color'] = np.where(is_harvested, "#22c55e", "#84cc16")
+    df['dashoffset'] = 213.6 * (1 - progress / 100)
+    df['ring_label'] = np.where(is_harvested, "✓", pd.Series(progress, index=df.index).astype(str) + "%")
+    df['care_steps'] = stage_care
+    # The raw Timestamp isn't JSON-serializable and planted_str replaces it for display.
+    # Blank editor cells come through as NaN, which JSON.parse rejects, so hand them over as None
+    df = df.drop(columns="planted")
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+# folium, streamlit_folium and requests are heavy to import, so they're only loaded
+# the first time the page that needs them is opened (sys.modules caches them after that)
+
+@st.cache_resource
+def http_session():
+    """Shared session so cache misses reuse a warm keep-alive connection to wttr.in."""
+    import requests
+    session = requests.Session()
+    session.headers.update({"User-Agent": "FarmOS"})
+    return session
 
-        days_left = (ready_date - now).days
-        is_harvested = days_left < 0
-        progress = 100 if is_harvested else max(0, min(100, int((days_passed / total_days) * 100)))
+@st.cache_data(ttl=900, show_spinner=False)
+def fetch_weather(city: str) -> dict:
+    """Fetches the wttr.in report for a town, cached for 15 minutes."""
+    r = http_session().get(f"https://wttr.in/{city}?format=j1", timeout=(3, 5))
+    r.raise_for_status()
+    return orjson.loads(r.content)
 
-        processed.append({
-            **item,
-            "planted_str": p_date.strftime("%Y-%m-%d"),
-            "progress": progress,
-            "status": "Harvested" if is_harvested else f"{curr_icon} {curr_stage}",
-            "days_left": days_left,
-            "overdue_label": f"Overdue by {abs(days_left)}" if is_harvested else f"{days_left} days left",
-            "is_harvested": is_harvested,
-            "care_steps": stage_care
-        })
-    return processed
+def make_base_map(lat, lon, zoom):
+    """Builds a fresh satellite map with the Draw tool. Not cached: st_folium rewrites element ids each time it renders a map."""
+    import folium
+    from folium.plugins import Draw
+    m = folium.Map(location=[lat, lon], zoom_start=zoom, tiles="https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}", attr="Google Satellite")
+    Draw(export=True).add_to(m)
+    return m
+
+# --- 3. SECURITY CHECK ---
+def check_password():
+    def password_entered():
+        if st.session_state["password"] == st.secrets["password"]:
+            st.session_state["password_correct"] = True
+            del st.session_state["password"]
+        else:
+            st.session_state["password_correct"] = False
+    def password_form():
+        # A form only submits on Enter/click, so focus changes don't trigger reruns
+        with st.form("login"):
+            st.text_input("FarmOS Password", type="password", key="password")
+            st.form_submit_button("Log in", on_click=password_entered)
+    if "password_correct" not in st.session_state:
+        password_form()
+        return False
+    elif not st.session_state["password_correct"]:
+        password_form()
+        st.error("😕 Password incorrect")
+        return False
+    return True
+
+if not check_password():
+    st.stop()
+
+# --- 4. COMPONENTS ---
+# Interactive crop cards are a static HTML/JS component; only the crop data is sent on each rerun
+dashboard = components.declare_component("dashboard", path=str(Path(__file__).parent / "components" / "dashboard"))
 
 # --- 5. SIDEBAR & NAVIGATION ---
 if 'crop_db' not in st.session_state:
-    st.session_state.crop_db = [
-        {"name": "Sweet Corn", "planted": "2025-11-15", "qty": "600 seedlings", "area": "4150 m²", "rainfall_mm": 45},
-        {"name": "Beetroot", "planted": "2025-11-30", "qty": "200 seedlings", "area": "420 m²", "rainfall_mm": 12},
-    ]
+    # Kept as a typed DataFrame so every page reads columns directly instead of rebuilding one
+    st.session_state.crop_db = pd.DataFrame({
+        "name": ["Sweet Corn", "Beetroot"],
+        "planted": ["2025-11-15", "2025-11-30"],
+        "qty": ["600 seedlings", "200 seedlings"],
+        "area": ["4150 m²", "420 m²"],
+        "rainfall_mm": [45, 12],
+    }).astype(CROP_DB_DTYPES)
+# Bumped on every crop_db mutation so pages can tell when their derived data is stale
+if 'crop_db_version' not in st.session_state:
+    st.session_state.crop_db_version = 0
 
 with st.sidebar:
-    st.markdown("<h1 class='text-white text-2xl font-black'>🚜 FarmOS Pro</h1>", unsafe_allow_html=True)
+    st.title("🚜 FarmOS Pro")
     page = st.radio("Navigation:", ["📊 Dashboard", "🛰️ Field Mapper", "🌦️ Weather", "⚙️ Manage Inventory"])
     
     st.divider()
     if page == "📊 Dashboard":
         st.subheader("🗓️ Target Harvest Planner")
         target_date = st.date_input("Target Harvest Date:", value=datetime.now() + timedelta(days=90))
-        calc = [{"Crop": k, "Plant By": (target_date - timedelta(days=v['totalDuration'])).strftime('%Y-%m-%d')} 
-                for k, v in CROP_STAGES.items()]
-        st.table(pd.DataFrame(calc))
+        plant_by = (pd.Timestamp(target_date) - pd.to_timedelta(CROP_DURATIONS, unit="D")).dt.strftime('%Y-%m-%d')
+        st.table(plant_by.rename("Plant By").rename_axis("Crop").reset_index())
     
     if st.button("Logout"):
         st.session_state["password_correct"] = False
         st.rerun()
 
 # --- 6. PAGE CONTENT ---
-
-if page == "📊 Dashboard":
-    processed_data = process_crops(st.session_state.crop_db)
+# Each page is a fragment, so its own widget interactions rerun only that page
+@st.fragment
+def render_dashboard():
+    proc_key = (st.session_state.crop_db_version, get_sast_now().date())
+    if st.session_state.get("proc_key") != proc_key:
+        st.session_state.proc_cache = process_crops(st.session_state.crop_db, proc_key[1])
+        st.session_state.proc_key = proc_key
+    processed_data = st.session_state.proc_cache
     active = len([c for c in processed_data if not c['is_harvested']])
-    crops_json = json.dumps(processed_data)
-    
-    # JavaScript + HTML Component for the Interactive Cards
-    dashboard_html = f"""
-    <script src="https://cdn.tailwindcss.com"></script>
-    <div class="bg-[#0f172a] text-white p-8 font-sans min-h-screen">
-        <h1 class="text-4xl font-extrabold tracking-tight">Farm Intelligence 🚜</h1>
-        <p class="text-[#84cc16] font-mono font-bold mt-2 text-lg mb-10">{get_sast_now().strftime('%A, %B %d')}</p>
-        
-        <div class="grid grid-cols-1 md:grid-cols-2 gap-6 mb-12">
-            <div class="bg-[#1e293b] p-6 rounded-2xl border border-gray-800 shadow-xl">
-                <p class="text-gray-400 text-sm font-semibold uppercase tracking-wider">Active Growing</p>
-                <h2 class="text-4xl font-black mt-2 text-blue-500">{active}</h2>
-            </div>
-            <div class="bg-[#1e293b] p-6 rounded-2xl border border-gray-800 shadow-xl">
-                <p class="text-gray-400 text-sm font-semibold uppercase tracking-wider">Harvested</p>
-                <h2 class="text-4xl font-black mt-2 text-green-500">{len(processed_data)-active}</h2>
-            </div>
-        </div>
-
-        <div id="card-container" class="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 gap-8"></div>
+    dashboard(crops=processed_data, today=get_sast_now().strftime('%A, %B %d'),
+              active=active, harvested=len(processed_data) - active, key="dash")
 
-        <div id="modal-overlay" class="hidden fixed inset-0 bg-black/80 backdrop-blur-sm z-50 flex items-center justify-center p-4">
-            <div id="modal" class="bg-[#1e293b] w-full max-w-md rounded-3xl border border-slate-700 shadow-2xl p-8 transform transition-all">
-                <h2 id="modal-title" class="text-3xl font-black mb-2"></h2>
-                <p id="modal-status" class="text-lime-500 font-bold mb-6"></p>
-                <div class="space-y-4" id="modal-steps"></div>
-                <button onclick="closeModal()" class="w-full mt-8 bg-lime-600 hover:bg-lime-500 text-white font-bold py-4 rounded-xl transition">Dismiss</button>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        const data = {crops_json};
-        
-        function openModal(index) {{
-            const crop = data[index];
-            document.getElementById('modal-title').innerText = crop.name;
-            document.getElementById('modal-status').innerText = "Current Stage: " + crop.status;
-            const stepsCont = document.getElementById('modal-steps');
-            stepsCont.innerHTML = crop.care_steps.map(step => 
-                `<div class="flex items-center space-x-3 bg-slate-800/50 p-4 rounded-xl">
-                    <span class="text-lime-500">✔</span>
-                    <span class="text-sm text-slate-200">${{step}}</span>
-                </div>`
-            ).join('');
-            
-            document.getElementById('modal-overlay').classList.remove('hidden');
-        }}
-
-        function closeModal() {{
-            document.getElementById('modal-overlay').classList.add('hidden');
-        }}
-
-        const container = document.getElementById('card-container');
-        container.innerHTML = data.map((crop, i) => {{
-            const ringColor = crop.is_harvested ? "#22c55e" : "#84cc16";
-            const offset = 213.6 * (1 - crop.progress / 100);
-            
-            return `
-            <div onclick="openModal(${{i}})" class="bg-[#1e293b] p-6 rounded-3xl border border-gray-800 shadow-lg cursor-pointer hover:border-lime-500/50 transition-all">
-                <div class="flex justify-between items-start mb-6">
-                    <h3 class="text-2xl font-bold text-white">${{crop.name}}</h3>
-                    <span class="bg-slate-700 text-[10px] px-3 py-1 rounded-full font-bold uppercase tracking-widest text-slate-300">${{crop.status}}</span>
-                </div>
-                <div class="flex items-center space-x-5 mb-8">
-                    <div class="relative w-20 h-20 flex items-center justify-center">
-                        <svg class="w-full h-full transform -rotate-90">
-                            <circle cx="40" cy="40" r="34" stroke="#2d3748" stroke-width="6" fill="transparent" />
-                            <circle cx="40" cy="40" r="34" stroke="${{ringColor}}" stroke-width="6" fill="transparent" 
-                                stroke-dasharray="213.6" stroke-dashoffset="${{offset}}" stroke-linecap="round" />
-                        </svg>
-                        <div class="absolute inset-0 flex items-center justify-center font-bold text-white text-sm">
-                            ${{crop.is_harvested ? '✓' : crop.progress + '%'}}
-                        </div>
-                    </div>
-                    <div>
-                        <p class="text-xl font-black text-white">${{crop.overdue_label}}</p>
-                        <p class="text-[11px] text-gray-500 mt-1">Planted: ${{crop.planted_str}}</p>
-                        <p class="text-[11px] text-blue-400 font-bold">💧 Rain: ${{crop.rainfall_mm}}mm</p>
-                    </div>
-                </div>
-                <div class="pt-5 border-t border-gray-800 flex justify-between">
-                    <p class="text-xs font-bold text-lime-500">Area: <span class="text-white font-normal">${{crop.area}}</span></p>
-                    <p class="text-xs font-bold text-lime-500">Qty: <span class="text-white font-normal">${{crop.qty}}</span></p>
-                </div>
-            </div>`;
-        }}).join('');
-    </script>
-    """
-    components.html(dashboard_html, height=1200, scrolling=True)
-
-elif page == "🛰️ Field Mapper":
-    st.markdown("<div class='p-8'><h1 class='text-white text-4xl font-black mb-4'>🛰️ Field Mapper</h1>", unsafe_allow_html=True)
+@st.fragment
+def render_field_mapper():
+    from streamlit_folium import st_folium
+    st.title("🛰️ Field Mapper")
     col1, col2 = st.columns([3, 1])
     
     # Initialize area variable
     calculated_area_m2 = 0
     
     with col1:
-        m = folium.Map(location=[-22.86, 30.60], zoom_start=15, tiles="https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}", attr="Google Satellite")
-        Draw(export=True).add_to(m)
+        m = make_base_map(-22.86, 30.60, 15)
         output = st_folium(m, width="100%", height=600)
         
         # Area Logic Integration
@@ -304,28 +271,31 @@ elif page == "🛰️ Field Mapper":
                 if st.form_submit_button("✅ Save to Inventory"):
                     new_entry = {
                         "name": selected_crop, 
-                        "planted": plant_date.strftime("%Y-%m-%d"), 
+                        "planted": pd.Timestamp(plant_date),
                         "qty": qty_input, 
                         "area": f"{int(calculated_area_m2)} m²", # UPDATED: Dynamic area injected here
                         "rainfall_mm": rain_input
                     }
-                    st.session_state.crop_db.append(new_entry)
+                    new_row = pd.DataFrame([new_entry]).astype(CROP_DB_DTYPES)
+                    st.session_state.crop_db = pd.concat([st.session_state.crop_db, new_row], ignore_index=True)
+                    st.session_state.crop_db_version += 1
                     st.success(f"Added to Inventory with {int(calculated_area_m2)} m²!")
                     st.rerun()
         else:
             st.info("Draw a polygon on the map to calculate area and link to inventory.")
 
-elif page == "🌦️ Weather":
-    st.markdown("<div class='p-8'><h1 class='text-white text-4xl font-black mb-6'>🌦️ Local Weather</h1>", unsafe_allow_html=True)
+@st.fragment
+def render_weather():
+    st.title("🌦️ Local Weather")
     city = st.text_input("Enter Nearest Town:", "Sibasa")
     try:
-        res = requests.get(f"https://wttr.in/{city}?format=j1").json()
+        res = fetch_weather(city)
         curr = res['current_condition'][0]
         st.metric("Temperature", f"{curr['temp_C']}°C", curr['weatherDesc'][0]['value'])
         
         # Rainfall History Chart
         st.subheader("📊 Crop Rainfall History")
-        rain_df = pd.DataFrame(st.session_state.crop_db)
+        rain_df = st.session_state.crop_db[["name", "rainfall_mm"]]
         if not rain_df.empty:
             chart = alt.Chart(rain_df).mark_bar(cornerRadiusTopLeft=10, cornerRadiusTopRight=10).encode(
                 x='name:N', y='rainfall_mm:Q', color=alt.value('#2563eb'), tooltip=['name', 'rainfall_mm']
@@ -334,13 +304,10 @@ elif page == "🌦️ Weather":
     except:
         st.error("Weather service sync failed.")
 
-elif page == "⚙️ Manage Inventory":
-    st.markdown("<div class='p-8'>", unsafe_allow_html=True)
+@st.fragment
+def render_inventory():
     st.title("⚙️ Manage Inventory")
-    df_to_edit = pd.DataFrame(st.session_state.crop_db)
-    df_to_edit["planted"] = pd.to_datetime(df_to_edit["planted"])
-    
-    edited_df = st.data_editor(df_to_edit, num_rows="dynamic", use_container_width=True,
+    edited_df = st.data_editor(st.session_state.crop_db, num_rows="dynamic", use_container_width=True,
         column_config={
             "name": st.column_config.SelectboxColumn("Crop", options=list(CROP_STAGES.keys())),
             "planted": st.column_config.DateColumn("Plant Date")
@@ -348,10 +315,17 @@ elif page == "⚙️ Manage Inventory":
     )
     
     if st.button("💾 Save All Changes", type="primary"):
-        save_df = edited_df.copy()
-        save_df["planted"] = save_df["planted"].dt.strftime('%Y-%m-%d')
-        st.session_state.crop_db = save_df.to_dict('records')
-        st.success("Database updated!")
+        # Rows added in the editor can come back with plain dates or blank rainfall
+        st.session_state.crop_db = edited_df.fillna({"rainfall_mm": 0}).astype(CROP_DB_DTYPES)
+        st.session_state.crop_db_version += 1
+        st.toast("Database updated!")
+        # The editor was drawn from the old frame; rerun so it is keyed to the saved data before the next edit
         st.rerun()
-    st.markdown("</div>", unsafe_allow_html=True)
 
+PAGES = {
+    "📊 Dashboard": render_dashboard,
+    "🛰️ Field Mapper": render_field_mapper,
+    "🌦️ Weather": render_weather,
+    "⚙️ Manage Inventory": render_inventory,
+}
+PAGES[page]()